@@ -0,0 +1,80 @@
+"""
+Command line tool for analyzing and replaying shpyx traces.
+
+Usage:
+    python -m shpyx summary trace.jsonl --top 10
+    python -m shpyx replay trace.jsonl --parallelism 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from shpyx.runner import Runner
+from shpyx.trace import format_summary, read_trace, replay_trace, summarize_trace
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+def _positive_int(value: str) -> int:
+    """
+    Parse a positive integer command line argument.
+
+    Args:
+        value: The value of the argument, as given in the command line.
+
+    Returns:
+        The parsed integer.
+
+    Raises:
+        argparse.ArgumentTypeError: The value is not a positive integer.
+    """
+    try:
+        parsed = int(value)
+    except ValueError:
+        parsed = 0
+
+    if parsed < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got '{value}'")
+
+    return parsed
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """
+    The command line entry point of the trace tool.
+    """
+    parser = argparse.ArgumentParser(prog="python -m shpyx", description="Analyze and replay shpyx traces.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    summary_parser = subparsers.add_parser("summary", help="Print the slowest commands and time totals.")
+    summary_parser.add_argument("trace_file", type=Path)
+    summary_parser.add_argument("--top", type=_positive_int, default=10, help="Number of slowest commands to print.")
+
+    replay_parser = subparsers.add_parser("replay", help="Re-run the commands of a trace.")
+    replay_parser.add_argument("trace_file", type=Path)
+    replay_parser.add_argument(
+        "--parallelism", type=_positive_int, default=1, help="Number of commands to run at once."
+    )
+
+    parsed = parser.parse_args(argv)
+    try:
+        records = read_trace(parsed.trace_file)
+    except (OSError, ValueError, TypeError) as e:
+        parser.error(f"failed to read trace file '{parsed.trace_file}': {e}")
+
+    if parsed.command == "summary":
+        sys.stdout.write(format_summary(summarize_trace(records, top=parsed.top)))
+    else:
+        start = time.perf_counter()
+        replay_trace(records, runner=Runner(), parallelism=parsed.parallelism)
+        sys.stdout.write(f"Replayed {len(records)} commands in {time.perf_counter() - start:.3f}s\n")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -1,28 +1,33 @@
 from __future__ import annotations
 
 import os
-import platform
-import shlex
 import signal
 import subprocess
 import sys
-import tempfile
+import threading
 import time
-from typing import TYPE_CHECKING
 
 from shpyx.errors import ShpyxInternalError, ShpyxOSNotSupportedError, ShpyxVerificationError
 from shpyx.result import ShellCmdResult
 
+# Equivalent to `typing.TYPE_CHECKING`, without the cost of importing `typing` at runtime.
+TYPE_CHECKING = False
 if TYPE_CHECKING:
     from pathlib import Path
 
-"""The platform system (Linux/Darwin/Windows/Java) is used for platform specific code"""
-_SYSTEM = platform.system()
+"""
+The platform system (Linux/Darwin/Windows) is used for platform specific code.
+It is derived from `sys.platform`, as importing the `platform` module noticeably slows down `import shpyx`.
+"""
+_SYSTEM = {"linux": "Linux", "darwin": "Darwin", "win32": "Windows"}.get(sys.platform, sys.platform)
 
 
 if _SYSTEM != "Windows":
     import fcntl
 
+"""The monotonic clock used to measure the execution time of commands"""
+_clock = time.perf_counter
+
 
 def _is_action_required(*, user: bool | None, default: bool) -> bool:
     """
@@ -53,6 +58,8 @@ class Runner:
         verify_return_code: bool = True,
         verify_stderr: bool = False,
         use_signal_names: bool = True,
+        trace_file: Path | str | None = None,
+        trace_output: bool = False,
     ) -> None:
         """
         Create a command runner.
@@ -67,12 +74,18 @@ class Runner:
             verify_stderr: Whether to raise an exception if anything was written to stderr during the execution.
             use_signal_names:  Whether to log the name of the signal corresponding to a non-zero error code,
                                in case of result verification failure.
+            trace_file: Path of a JSON-lines file to append a trace record to, for every executed command.
+                        See `shpyx.trace` for analysis and replay of the trace.
+            trace_output: Whether to include the output of the commands in the trace records.
         """
         self._log_cmd = log_cmd
         self._log_output = log_output
         self._verify_return_code = verify_return_code
         self._verify_stderr = verify_stderr
         self._use_signal_names = use_signal_names
+        self._trace_file = trace_file
+        self._trace_output = trace_output
+        self._trace_lock = threading.Lock()
 
     @staticmethod
     def _log(msg: bytes | str) -> None:
@@ -134,6 +147,54 @@ class Runner:
         if _is_action_required(user=log_output, default=self._log_output):
             self._log(data)
 
+    def _trace(
+        self,
+        *,
+        result: ShellCmdResult,
+        args: str | list[str],
+        env: dict[str, str] | None,
+        exec_dir: Path | str | None,
+        unix_raw: bool | None,
+        start_time: float,
+        duration: float,
+    ) -> None:
+        """
+        Append a record of a finished command to the trace file, if tracing is enabled.
+
+        Args:
+            result: The command result object.
+            args: The command arguments, as supplied to `.run`.
+            env: The additional environment variables, as supplied to `.run`.
+            exec_dir: The execution directory of the command.
+            unix_raw: Whether the command was run with the `script` Unix utility, as supplied to `.run`.
+            start_time: The time at which the command was started, in seconds since the epoch.
+            duration: The execution time of the command, in seconds.
+        """
+        if self._trace_file is None:
+            return
+
+        # Imported here, so that the cost of importing the trace module is only paid when tracing is enabled.
+        from shpyx.trace import TraceRecord, write_trace_record  # noqa: PLC0415
+
+        record = TraceRecord(
+            args=args,
+            start=start_time,
+            end=start_time + duration,
+            return_code=result.return_code,
+            stdout_size=len(result.stdout.encode()),
+            stderr_size=len(result.stderr.encode()),
+            env=dict(env or {}),
+            cwd=None if exec_dir is None else str(exec_dir),
+            unix_raw=bool(unix_raw),
+        )
+        if self._trace_output:
+            record.stdout = result.stdout
+            record.stderr = result.stderr
+
+        # Commands may be run from multiple threads, make sure that records are not interleaved.
+        with self._trace_lock:
+            write_trace_record(self._trace_file, record)
+
     def _verify_result(
         self,
         *,
@@ -224,7 +285,10 @@ class Runner:
             ShpyxOSNotSupportedError: The current OS is not supported for this operation.
             ShpyxInternalError: Internal error when executing the command.
         """
-        tmp_file = tempfile.NamedTemporaryFile()  # noqa: SIM115
+        tmp_file = None
+
+        # Keep the original arguments for the trace, as they might be wrapped below.
+        orig_args = args
 
         if isinstance(args, str):
             # When a single string is passed, use an actual shell to support shell logic like bash piping.
@@ -232,6 +296,12 @@ class Runner:
             use_shell = True
 
             if unix_raw:
+                # Only needed for `script`, imported here to keep the import and the common path of `run` fast.
+                import shlex  # noqa: PLC0415
+                import tempfile  # noqa: PLC0415
+
+                tmp_file = tempfile.NamedTemporaryFile()  # noqa: SIM115
+
                 if _SYSTEM == "Linux":
                     # Old format: https://linux.die.net/man/1/script
                     # New format: https://man7.org/linux/man-pages/man1/script.1.html
@@ -252,16 +322,19 @@ class Runner:
             self._log(f"Running: {cmd_str}\n")
 
         # Build the command environment variables.
-        cmd_env = os.environ.copy()
+        # When no env vars are provided, the subprocess inherits the environment of the parent process by itself.
+        cmd_env = None
         if env is not None:
             # The provided env vars will take precedence over existing ones.
-            cmd_env = {**cmd_env, **env}
+            cmd_env = {**os.environ, **env}
 
         # Prepare the execution path.
         if exec_dir is not None:
             exec_dir = str(exec_dir)
 
         # Initialize the subprocess object.
+        start_time = time.time()
+        start_counter = _clock()
         try:
             p = subprocess.Popen(  # noqa: S603
                 args,
@@ -304,7 +377,11 @@ class Runner:
             self._add_stdout(result=result, data=stdout_data, log_output=log_output)
             self._add_stderr(result=result, data=stderr_data, log_output=log_output)
 
-            time.sleep(0.01)
+            # Wait for more output, returning early if the command has finished.
+            try:
+                p.wait(timeout=0.01)
+            except subprocess.TimeoutExpired:
+                pass
 
         # Get the remaining outputs and add them to the result.
         final_stdout, final_stderr = p.communicate()
@@ -314,10 +391,23 @@ class Runner:
         # Cleanup.
         p.stdout.close()
         p.stderr.close()
-        tmp_file.close()
+        if tmp_file is not None:
+            tmp_file.close()
 
         # Save return code.
         result.return_code = p.returncode
+        duration = _clock() - start_counter
+
+        # Record the execution in the trace, if required.
+        self._trace(
+            result=result,
+            args=orig_args,
+            env=env,
+            exec_dir=exec_dir,
+            unix_raw=unix_raw,
+            start_time=start_time,
+            duration=duration,
+        )
 
         # Verify that the command result is valid, based on the verification configuration.
         self._verify_result(
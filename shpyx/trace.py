@@ -0,0 +1,216 @@
+"""
+Recording, analysis and replay of shell command traces.
+
+A trace is a JSON-lines file, where every line describes a single command executed by a `Runner` that was created
+with `trace_file` set.
+"""
+
+from __future__ import annotations
+
+import json
+import shlex
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from pathlib import Path
+
+    from shpyx.result import ShellCmdResult
+    from shpyx.runner import Runner
+
+
+@dataclass
+class TraceRecord:
+    """
+    A single traced execution of a shell command.
+    """
+
+    """The command arguments, exactly as they were passed to `run`"""
+    args: str | list[str]
+
+    """
+    Start and end times of the execution, in seconds since the epoch.
+    The end time is derived from a monotonic clock, so that `end - start` is the accurate execution time.
+    """
+    start: float
+    end: float
+
+    """The return code of the command"""
+    return_code: int
+
+    """The sizes (in bytes) of the output streams of the command"""
+    stdout_size: int
+    stderr_size: int
+
+    """Environment variables set in addition to those of the parent process"""
+    env: dict[str, str] = field(default_factory=dict)
+
+    """The directory the command was executed in, `None` for the current directory"""
+    cwd: str | None = None
+
+    """Whether the command was run with the `script` Unix utility (see `unix_raw` in `Runner.run`)"""
+    unix_raw: bool = False
+
+    """The output streams of the command, only recorded when `trace_output` is enabled"""
+    stdout: str | None = None
+    stderr: str | None = None
+
+    @property
+    def duration(self) -> float:
+        """
+        The execution time of the command, in seconds.
+        """
+        return self.end - self.start
+
+    @property
+    def executable(self) -> str:
+        """
+        The executable of the command (the first word of the command line).
+        """
+        if isinstance(self.args, str):
+            try:
+                words = shlex.split(self.args)
+            except ValueError:
+                words = self.args.split()
+        else:
+            words = self.args
+
+        return words[0] if words else ""
+
+
+@dataclass
+class TraceSummary:
+    """
+    Aggregated statistics of a trace.
+    """
+
+    """The slowest commands, ordered from slowest to fastest"""
+    slowest: list[TraceRecord]
+
+    """The total execution time of each executable, ordered from longest to shortest"""
+    total_by_executable: dict[str, float]
+
+    """The time between the start of the first command and the end of the last one"""
+    wall_time: float
+
+    """The part of `wall_time` during which no command was running"""
+    idle_time: float
+
+    """The total sizes (in bytes) of the output streams of all the commands"""
+    stdout_size: int
+    stderr_size: int
+
+
+def write_trace_record(path: Path | str, record: TraceRecord) -> None:
+    """
+    Append a record to a trace file.
+    """
+    with open(path, "a") as trace_file:
+        trace_file.write(json.dumps(asdict(record)) + "\n")
+
+
+def read_trace(path: Path | str) -> list[TraceRecord]:
+    """
+    Read all the records from a trace file.
+    """
+    with open(path) as trace_file:
+        return [TraceRecord(**json.loads(line)) for line in trace_file if line.strip()]
+
+
+def summarize_trace(records: Sequence[TraceRecord], *, top: int = 10) -> TraceSummary:
+    """
+    Compute aggregated statistics for a list of trace records.
+
+    Args:
+        records: The trace records.
+        top: The number of slowest commands to include in the summary.
+
+    Returns:
+        The summary, as a `TraceSummary` object.
+    """
+    slowest = sorted(records, key=lambda record: record.duration, reverse=True)[:top]
+
+    totals: defaultdict[str, float] = defaultdict(float)
+    for record in records:
+        totals[record.executable] += record.duration
+    total_by_executable = dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    # Merge the execution intervals, accumulating the gaps in which nothing was running.
+    wall_time = 0.0
+    idle_time = 0.0
+    if records:
+        intervals = sorted((record.start, record.end) for record in records)
+        first_start = intervals[0][0]
+        covered_until = intervals[0][1]
+        for start, end in intervals[1:]:
+            if start > covered_until:
+                idle_time += start - covered_until
+            covered_until = max(covered_until, end)
+        wall_time = covered_until - first_start
+
+    return TraceSummary(
+        slowest=slowest,
+        total_by_executable=total_by_executable,
+        wall_time=wall_time,
+        idle_time=idle_time,
+        stdout_size=sum(record.stdout_size for record in records),
+        stderr_size=sum(record.stderr_size for record in records),
+    )
+
+
+def format_summary(summary: TraceSummary) -> str:
+    """
+    Format a trace summary as a human readable report.
+    """
+    lines = ["Slowest commands:"]
+    lines += [
+        f"  {record.duration:10.3f}s  {record.args if isinstance(record.args, str) else ' '.join(record.args)}"
+        for record in summary.slowest
+    ]
+    lines.append("Total time by executable:")
+    lines += [f"  {total:10.3f}s  {executable}" for executable, total in summary.total_by_executable.items()]
+    lines.append(f"Wall time: {summary.wall_time:.3f}s")
+    lines.append(f"Idle time: {summary.idle_time:.3f}s")
+    lines.append(f"Output size: {summary.stdout_size} bytes stdout, {summary.stderr_size} bytes stderr")
+
+    return "\n".join(lines) + "\n"
+
+
+def replay_trace(
+    records: Sequence[TraceRecord],
+    *,
+    runner: Runner,
+    parallelism: int = 1,
+) -> list[ShellCmdResult]:
+    """
+    Re-run the commands of a trace, in the order in which they were originally started.
+
+    Records are written to the trace when commands finish, so they are sorted by their start time before replaying.
+
+    The recorded environment variables, execution directory and `unix_raw` flag are reused, and return codes are not
+    verified.
+
+    Args:
+        records: The trace records.
+        runner: The runner to execute the commands with.
+        parallelism: The maximal number of commands to run at the same time.
+
+    Returns:
+        The results of the commands, ordered by the start time of their records.
+    """
+    records = sorted(records, key=lambda record: record.start)
+
+    def _replay(record: TraceRecord) -> ShellCmdResult:
+        return runner.run(
+            record.args,
+            env=record.env,
+            exec_dir=record.cwd,
+            unix_raw=record.unix_raw,
+            verify_return_code=False,
+        )
+
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        return list(executor.map(_replay, records))
@@ -0,0 +1,82 @@
+"""
+Test the import time of shpyx, using `python -X importtime`.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# Modules which are only needed for optional features, and must not be imported by `import shpyx`.
+_DEFERRED_MODULES = {
+    "platform",
+    "tempfile",
+    "shlex",
+    "json",
+    "concurrent.futures",
+    "typing",
+    "shpyx.trace",
+}
+
+# A line of `-X importtime` output: `import time: <self us> | <cumulative us> | <indented module name>`.
+# The header line of the output has no numbers, so it does not match.
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+\d+ \|\s+(?P<cumulative>\d+) \| (?P<indent> *)(?P<name>\S+)$")
+
+
+def _import_shpyx() -> tuple[int, set[str]]:
+    """Import shpyx in a fresh interpreter and return its cumulative import time (in us) and the modules it imported"""
+    repo_dir = str(Path(__file__).parent.parent)
+
+    # Run the interpreter isolated and without `site`, with a scrubbed environment, so that nothing else (like the
+    # `.pth` file of pytest-cov) imports modules before shpyx does.
+    env = {key: os.environ[key] for key in ("PATH", "SYSTEMROOT") if key in os.environ}
+    result = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-I",
+            "-S",
+            "-X",
+            "importtime",
+            "-c",
+            f"import sys; sys.path.insert(0, {repo_dir!r}); import shpyx",
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    # Child modules are listed before their parent, with a deeper indentation.
+    entries = [
+        (int(match["cumulative"]), len(match["indent"]), match["name"])
+        for match in map(_IMPORT_TIME_LINE.match, result.stderr.splitlines())
+        if match
+    ]
+    index = next(index for index, (_, _, name) in enumerate(entries) if name == "shpyx")
+    cumulative, indent, _ = entries[index]
+
+    modules = set()
+    for _, child_indent, child_name in reversed(entries[:index]):
+        if child_indent <= indent:
+            break
+        modules.add(child_name)
+
+    return cumulative, modules
+
+
+def test_import_time(record_property: Callable[[str, object], None]) -> None:
+    """Slow modules are imported on first use, not by `import shpyx`"""
+    cumulative, modules = _import_shpyx()
+
+    # Track the import time in the test report (e.g. `--junitxml`).
+    record_property("shpyx_import_time_us", cumulative)
+
+    assert "shpyx.runner" in modules
+    assert not _DEFERRED_MODULES & modules
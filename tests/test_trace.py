@@ -0,0 +1,187 @@
+"""
+Test command tracing, `shpyx.trace`.
+"""
+
+from __future__ import annotations
+
+import platform
+import tempfile
+from pathlib import Path
+
+import pytest
+import pytest_mock
+
+import shpyx
+from shpyx.__main__ import main
+from shpyx.trace import TraceRecord, read_trace, replay_trace, summarize_trace
+
+# Platform OS.
+_SYSTEM = platform.system()
+
+
+def _record(args: str | list[str], start: float, end: float) -> TraceRecord:
+    """Create a trace record with default values for the fields that are not relevant to the test"""
+    return TraceRecord(args=args, start=start, end=end, return_code=0, stdout_size=0, stderr_size=0)
+
+
+def test_trace_file() -> None:
+    """Every executed command is appended to the trace file"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        trace_file = Path(temp_dir) / "trace.jsonl"
+        runner = shpyx.Runner(trace_file=trace_file)
+
+        runner.run("echo 1", env={"MY_VAR": "10"})
+        runner.run(["echo", "22"], exec_dir=temp_dir)
+        with pytest.raises(shpyx.ShpyxVerificationError):
+            runner.run("echo 1 1>&2 && exit 3")
+
+        records = read_trace(trace_file)
+
+    assert [record.args for record in records] == ["echo 1", ["echo", "22"], "echo 1 1>&2 && exit 3"]
+    assert [record.return_code for record in records] == [0, 0, 3]
+    assert [record.env for record in records] == [{"MY_VAR": "10"}, {}, {}]
+    assert [record.cwd for record in records] == [None, temp_dir, None]
+    assert [record.unix_raw for record in records] == [False, False, False]
+    assert (records[1].stdout_size, records[1].stderr_size) == (3, 0)
+    assert (records[2].stdout_size, records[2].stderr_size) == (0, 4 if _SYSTEM == "Windows" else 2)
+    assert all(record.end >= record.start for record in records)
+
+    # The output is not recorded by default.
+    assert records[0].stdout is None
+    assert records[0].stderr is None
+
+
+def test_trace_duration(mocker: pytest_mock.MockerFixture) -> None:
+    """The execution time is measured with a monotonic clock, from the start of the command until it finishes"""
+    mocker.patch("shpyx.runner._clock", side_effect=[10.0, 12.5])
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        trace_file = Path(temp_dir) / "trace.jsonl"
+        shpyx.Runner(trace_file=trace_file).run(["echo", "1"])
+
+        records = read_trace(trace_file)
+
+    assert len(records) == 1
+    assert records[0].duration == 2.5
+
+
+def test_trace_output() -> None:
+    """The output of the commands is recorded when `trace_output` is enabled"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        trace_file = Path(temp_dir) / "trace.jsonl"
+        shpyx.Runner(trace_file=trace_file, trace_output=True).run(["echo", "1"])
+
+        records = read_trace(trace_file)
+
+    assert len(records) == 1
+    assert (records[0].stdout, records[0].stderr) == ("1\n", "")
+
+
+def test_executable() -> None:
+    """The executable is the first word of the command, for both string and list commands"""
+    assert _record("ls -la | grep x", 0, 1).executable == "ls"
+    assert _record(["git", "status"], 0, 1).executable == "git"
+    assert _record("echo 'unterminated", 0, 1).executable == "echo"
+    assert _record("", 0, 1).executable == ""
+
+
+def test_summarize_trace() -> None:
+    """Slowest commands, totals by executable and the gaps in which no command was running"""
+    records = [
+        _record("sleep 1", 0, 1),
+        _record(["make", "all"], 0.5, 4),
+        _record("sleep 2", 6, 8),
+        _record("make test", 6.5, 7),
+    ]
+
+    summary = summarize_trace(records, top=2)
+
+    assert [record.args for record in summary.slowest] == [["make", "all"], "sleep 2"]
+    assert summary.total_by_executable == {"make": 4.0, "sleep": 3.0}
+    assert summary.wall_time == 8
+    assert summary.idle_time == 2
+    assert (summary.stdout_size, summary.stderr_size) == (0, 0)
+
+
+def test_summarize_empty_trace() -> None:
+    """An empty trace has an empty summary"""
+    summary = summarize_trace([])
+    assert (summary.slowest, summary.total_by_executable, summary.wall_time, summary.idle_time) == ([], {}, 0, 0)
+    assert (summary.stdout_size, summary.stderr_size) == (0, 0)
+
+
+def test_replay_trace() -> None:
+    """Commands are replayed in the order in which they were started, with the recorded env vars"""
+    cmd = "echo %MY_VAR%" if _SYSTEM == "Windows" else "echo $MY_VAR"
+    records = [
+        _record("exit 3", 1, 2),
+        TraceRecord(args=cmd, start=0, end=3, return_code=0, stdout_size=0, stderr_size=0, env={"MY_VAR": "10"}),
+    ]
+
+    results = replay_trace(records, runner=shpyx.Runner(), parallelism=2)
+
+    assert [result.stdout.strip() for result in results] == ["10", ""]
+    assert [result.return_code for result in results] == [0, 3]
+
+
+@pytest.mark.skipif(_SYSTEM == "Windows", reason="`unix_raw` is only supported on Unix")
+def test_replay_trace_unix_raw() -> None:
+    """Commands that were run with `unix_raw` are replayed with `unix_raw`"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        trace_file = Path(temp_dir) / "trace.jsonl"
+        shpyx.Runner(trace_file=trace_file).run("echo 1", unix_raw=True)
+
+        records = read_trace(trace_file)
+
+    assert [record.unix_raw for record in records] == [True]
+
+    # The `script` utility converts line breaks to carriage return + line break.
+    results = replay_trace(records, runner=shpyx.Runner())
+    assert results[0].stdout.endswith("1\r\n")
+
+
+def test_main(capfd: pytest.CaptureFixture[str]) -> None:
+    """Summarize and replay a trace from the command line"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        trace_file = Path(temp_dir) / "trace.jsonl"
+        shpyx.Runner(trace_file=trace_file).run(["echo", "1"])
+
+        main(["summary", str(trace_file)])
+        cap_stdout, _ = capfd.readouterr()
+        assert "Slowest commands:" in cap_stdout
+        assert "s  echo 1\n" in cap_stdout
+        assert "Idle time: 0.000s\n" in cap_stdout
+        assert "Output size: 2 bytes stdout, 0 bytes stderr\n" in cap_stdout
+
+        main(["replay", str(trace_file), "--parallelism", "2"])
+        cap_stdout, _ = capfd.readouterr()
+        assert cap_stdout.startswith("Replayed 1 commands in ")
+
+
+@pytest.mark.parametrize("parallelism", ["0", "-1", "two"])
+def test_main_invalid_parallelism(capfd: pytest.CaptureFixture[str], parallelism: str) -> None:
+    """A non positive parallelism is rejected with a usage error"""
+    with pytest.raises(SystemExit) as exc:
+        main(["replay", "trace.jsonl", "--parallelism", parallelism])
+
+    assert exc.value.code == 2
+
+    _, cap_stderr = capfd.readouterr()
+    assert f"must be a positive integer, got '{parallelism}'" in cap_stderr
+
+
+def test_main_invalid_trace_file(capfd: pytest.CaptureFixture[str]) -> None:
+    """A missing or malformed trace file is reported with a usage error"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        missing_file = Path(temp_dir) / "missing.jsonl"
+        malformed_file = Path(temp_dir) / "malformed.jsonl"
+        malformed_file.write_text('{"args": "echo 1"}\n')
+
+        for trace_file in (missing_file, malformed_file):
+            with pytest.raises(SystemExit) as exc:
+                main(["summary", str(trace_file)])
+
+            assert exc.value.code == 2
+
+            _, cap_stderr = capfd.readouterr()
+            assert f"failed to read trace file '{trace_file}'" in cap_stderr